@@ -1,4 +1,4 @@
-from jax import vmap
+from jax import checkpoint, lax
 import jax.numpy as np
 
 from ergo.distributions import point_density
@@ -6,6 +6,42 @@ from ergo.scale import Scale
 
 from . import condition
 
+# Above this many points, PartialCrossEntropyCondition evaluates the
+# logpdf in chunks of this size to bound peak memory
+logpdf_chunk_size = 4096
+
+
+def weighted_logpdf_sum(logpdf, xs, ps, chunk_size=logpdf_chunk_size):
+    """
+    Compute np.dot(ps, logpdf(xs)), streaming over chunks of xs with
+    lax.map when xs is large so that we never materialize all logpdfs
+    at once. logpdf must be vectorized.
+
+    The chunk body is checkpointed: otherwise, under grad, the scan
+    behind lax.map would store every chunk's intermediates for the
+    backward pass, and memory would again grow with xs.size.
+    """
+    if xs.size <= chunk_size:
+        return np.dot(ps, logpdf(xs))
+    num_chunks = -(-xs.size // chunk_size)
+    padding = num_chunks * chunk_size - xs.size
+    # Pad with a real point and zero weight so that padding contributes nothing
+    padded_xs = np.concatenate((xs, np.full(padding, xs[-1])))
+    padded_ps = np.concatenate((ps, np.zeros(padding)))
+    chunks = (
+        padded_xs.reshape((num_chunks, chunk_size)),
+        padded_ps.reshape((num_chunks, chunk_size)),
+    )
+
+    @checkpoint
+    def chunk_sum(chunk):
+        chunk_xs, chunk_ps = chunk
+        return np.dot(chunk_ps, logpdf(chunk_xs))
+
+    chunk_sums = lax.map(chunk_sum, chunks)
+    return np.sum(chunk_sums)
+
+
 # TODO: Implement normalize/denormalize for CrossEntropyCondition
 
 
@@ -57,8 +93,9 @@ class PartialCrossEntropyCondition(condition.Condition):
         super().__init__(weight)
 
     def loss(self, q_dist) -> float:
-        q_logps = vmap(q_dist.logpdf)(self.xs)
-        cross_entropy = -np.dot(self.ps, q_logps)
+        cross_entropy = -weighted_logpdf_sum(
+            q_dist.logpdf, self.xs, self.ps, chunk_size=logpdf_chunk_size
+        )
         return self.weight * cross_entropy
 
     def destructure(self):
@@ -72,13 +109,9 @@ class PartialCrossEntropyCondition(condition.Condition):
         return "Minimize the cross-entropy of the two distributions (p may be partial)"
 
     def normalize(self, scale: Scale):
-        # TODO: Vectorization should be part of what Scale does
-        # scale.normalize_point / scale.denormalize_point is pretty much
-        # vectorized anyway
-        normed_xs = vmap(scale.normalize_point)(self.xs)
+        normed_xs = scale.normalize_points(self.xs)
         return PartialCrossEntropyCondition(normed_xs, self.ps, self.weight)
 
     def denormalize(self, scale: Scale):
-        # TODO: Vectorization should be part of what Scale does
-        denormed_xs = vmap(scale.denormalize_point)(self.xs)
+        denormed_xs = scale.denormalize_points(self.xs)
         return PartialCrossEntropyCondition(denormed_xs, self.ps, self.weight)
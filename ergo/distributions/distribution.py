@@ -6,6 +6,8 @@ Specifies interface for specific Distribution Classes
 
 from abc import ABC, abstractmethod
 
+import jax.numpy as np
+
 from ergo.scale import Scale
 
 
@@ -39,7 +41,7 @@ class Distribution(ABC):
 
         if percentiles is None:
             percentiles = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
-        values = [self.ppf(q) for q in percentiles]
+        values = self.ppf(np.array(percentiles))
         return [
             IntervalCondition(percentile, max=float(value))
             for (percentile, value) in zip(percentiles, values)
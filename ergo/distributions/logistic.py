@@ -4,11 +4,12 @@ Logistic distribution
 from dataclasses import dataclass
 from typing import Any, Optional
 
-from jax import scipy
+from jax import nn, scipy
 import jax.numpy as np
 import scipy as oscipy
 
 from ergo.scale import Scale
+import ergo.static as static
 
 from .distribution import Distribution
 
@@ -65,16 +66,14 @@ class Logistic(Distribution):
         return self.scale.denormalize_density(x, p)
 
     def logpdf(self, x):
-        return np.log(self.pdf(x))
+        logp = static.logistic_logpdf(self.scale.normalize_point(x), self.loc, self.s)
+        return logp + np.log(self.scale.denormalize_density(x, 1.0))
 
     def cdf(self, x):
-        y = (self.scale.normalize_point(x) - self.loc) / self.s
-        return scipy.stats.logistic.cdf(y)
+        return nn.sigmoid((self.scale.normalize_point(x) - self.loc) / self.s)
 
     def ppf(self, q):
-        return self.scale.denormalize_point(
-            oscipy.stats.logistic(loc=self.loc, scale=self.s).ppf(q)
-        )
+        return self.scale.denormalize_point(self.loc + self.s * scipy.special.logit(q))
 
     def sample(self):
         return self.scale.denormalize_point(
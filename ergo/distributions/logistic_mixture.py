@@ -1,12 +1,12 @@
-from dataclasses import dataclass
-from typing import Sequence
+from dataclasses import InitVar, dataclass
+from typing import Optional, Sequence, Tuple
 
 from jax import nn, scipy
 import jax.numpy as np
 import numpy as onp
-import scipy as oscipy
 
 from ergo.scale import Scale
+import ergo.static as static
 
 from .base import categorical
 from .distribution import Distribution
@@ -26,20 +26,103 @@ class LogisticMixture(Distribution, Optimizable):
 
     components: Sequence[Logistic]
     probs: Sequence[float]
+    # (locs, ss, floors, ceilings) of the components, if already available
+    # as arrays (as in from_params)
+    logistic_params: InitVar[Optional[Tuple]] = None
+
+    def __post_init__(self, logistic_params):
+        self._probs = np.array(self.probs, dtype=np.float32)
+        self._logprobs = np.log(self._probs)
+
+        # When all components are (possibly truncated) logistics, keep their
+        # params as arrays so that pdf/logpdf/cdf evaluate all components in
+        # a few vectorized ops instead of dispatching to each component
+        if logistic_params is not None:
+            self._all_logistic = True
+            self._set_logistic_params(*logistic_params)
+            return
+        truncations = [c if isinstance(c, Truncate) else None for c in self.components]
+        bases = [c.base_dist if isinstance(c, Truncate) else c for c in self.components]
+        self._all_logistic = all(isinstance(b, Logistic) for b in bases)
+        if self._all_logistic:
+            self._set_logistic_params(
+                np.array([b.loc for b in bases]),
+                np.array([b.s for b in bases]),
+                np.array([-np.inf if t is None else t.floor for t in truncations]),
+                np.array([np.inf if t is None else t.ceiling for t in truncations]),
+            )
+
+    def _set_logistic_params(self, locs, ss, floors, ceilings):
+        self._locs = locs
+        self._ss = ss
+        self._floors = floors
+        self._ceilings = ceilings
+        # Mass below each floor and above each ceiling, for all components in
+        # a single sigmoid. As in Truncate, infinite bounds are swapped out
+        # before the cdf so that they don't produce nan gradients.
+        bounds = np.stack(
+            [
+                np.where(floors == -np.inf, 0.0, floors),
+                np.where(ceilings == np.inf, 1.0, ceilings),
+            ]
+        )
+        bound_cdfs = nn.sigmoid((self.scale.normalize_point(bounds) - locs) / ss)
+        self._p_belows = np.where(floors == -np.inf, 0.0, bound_cdfs[0])
+        p_aboves = np.where(ceilings == np.inf, 0.0, 1.0 - bound_cdfs[1])
+        self._p_insides = 1.0 - (self._p_belows + p_aboves)
+
+    def __eq__(self, other):
+        # probs may be an array, so compare it elementwise rather than
+        # relying on the generated tuple comparison
+        if isinstance(other, LogisticMixture):
+            return self.components == other.components and onp.array_equal(
+                onp.asarray(self.probs), onp.asarray(other.probs)
+            )
+        return NotImplemented
 
     # Distribution
 
     def pdf(self, x):
-        return np.sum([c.pdf(x) * p for (c, p) in zip(self.components, self.probs)])
+        if self._all_logistic:
+            logps, inside = self._component_logpdfs(x)
+            # Mask the densities rather than exponentiating a logsumexp, which
+            # would have a nan gradient where x is outside all components
+            return np.dot(np.where(inside, np.exp(logps), 0.0), self._probs)
+        return np.dot(self._probs, np.stack([c.pdf(x) for c in self.components]))
 
     def logpdf(self, x):
-        scores = []
-        for (c, p) in zip(self.components, self.probs):
-            scores.append(c.logpdf(x) + np.log(p))
-        return scipy.special.logsumexp(np.array(scores))
+        if self._all_logistic:
+            return self._logpdf_vec(x)
+        component_scores = np.stack([c.logpdf(x) for c in self.components], axis=-1)
+        return scipy.special.logsumexp(component_scores + self._logprobs, axis=-1)
 
     def cdf(self, x):
-        return np.sum([c.cdf(x) * p for (c, p) in zip(self.components, self.probs)])
+        if self._all_logistic:
+            return self._cdf_vec(x)
+        return np.dot(self._probs, np.stack([c.cdf(x) for c in self.components]))
+
+    def _component_logpdfs(self, x):
+        # Trailing axis of length 1 broadcasts x against the components
+        x = np.expand_dims(x, -1)
+        logps = (
+            static.logistic_logpdf(self.scale.normalize_point(x), self._locs, self._ss)
+            + np.log(self.scale.denormalize_density(x, 1.0))
+            - np.log(self._p_insides)
+        )
+        inside = (x >= self._floors) & (x <= self._ceilings)
+        return logps, inside
+
+    def _logpdf_vec(self, x):
+        logps, inside = self._component_logpdfs(x)
+        component_scores = np.where(inside, logps, -np.inf)
+        return scipy.special.logsumexp(component_scores + self._logprobs, axis=-1)
+
+    def _cdf_vec(self, x):
+        x = np.expand_dims(x, -1)
+        base_cdfs = nn.sigmoid((self.scale.normalize_point(x) - self._locs) / self._ss)
+        cdfs = (base_cdfs - self._p_belows) / self._p_insides
+        cdfs = np.where(x < self._floors, 0.0, np.where(x > self._ceilings, 1.0, cdfs))
+        return np.dot(cdfs, self._probs)
 
     def ppf(self, q):
         """
@@ -53,22 +136,16 @@ class LogisticMixture(Distribution, Optimizable):
         The quantile of a mixture distribution can always be found
         within the range of its components quantiles:
         https://cran.r-project.org/web/packages/mistr/vignettes/mistr-introduction.pdf
+
+        q may be an array, in which case all quantiles are found in a
+        single jitted bisection.
         """
         if len(self.components) == 1:
             return self.components[0].ppf(q)
-        ppfs = [c.ppf(q) for c in self.components]
-        cmin = np.min(ppfs)
-        cmax = np.max(ppfs)
-
-        return oscipy.optimize.bisect(
-            lambda x: self.cdf(x) - q,
-            cmin - abs(cmin / 100),
-            cmax + abs(cmax / 100),
-            maxiter=1000,
-        )
+        return static.mixture_ppf(*self.destructure(), np.array(q))
 
     def sample(self):
-        i = categorical(np.array(self.probs))
+        i = categorical(self._probs)
         component_dist = self.components[i]
         return component_dist.sample()
 
@@ -139,12 +216,11 @@ class LogisticMixture(Distribution, Optimizable):
         s_range = s_max - s_min
         ss = s_min + scipy.special.expit(structured_params[:, 1]) * s_range
         # Allow probs > 0.01
-        probs = list(
-            0.01
-            + nn.softmax(structured_params[:, 2])
-            * (1 - 0.01 * structured_params[:, 2].size)
+        probs = 0.01 + nn.softmax(structured_params[:, 2]) * (
+            1 - 0.01 * structured_params[:, 2].size
         )
-        # Bundle up components
+        # Bundle up components. These are only used for repr, destructure
+        # and sampling; pdf/logpdf/cdf use the arrays in logistic_params.
         component_logistics = [
             Logistic(l, s, scale, normalized=True) for (l, s) in zip(locs, ss)
         ]
@@ -152,7 +228,13 @@ class LogisticMixture(Distribution, Optimizable):
             Truncate(base_dist=cl, floor=floor, ceiling=ceiling)
             for cl in component_logistics
         ]
-        mixture = cls(components=components, probs=probs)
+        floors = np.full(locs.shape, floor)
+        ceilings = np.full(locs.shape, ceiling)
+        mixture = cls(
+            components=components,
+            probs=probs,
+            logistic_params=(locs, ss, floors, ceilings),
+        )
         return mixture
 
     @staticmethod
@@ -185,8 +267,12 @@ class LogisticMixture(Distribution, Optimizable):
         )
 
     @classmethod
-    def from_samples(cls, *args, init_tries=100, opt_tries=2, **kwargs):
-        # Increase default initialization and optimization tries
+    def from_samples(
+        cls, *args, init_tries=100, opt_tries=2, method="L-BFGS-B", **kwargs
+    ):
+        # Increase default initialization and optimization tries. Our params
+        # are unconstrained, so L-BFGS-B needs no bounds and converges in far
+        # fewer gradient evaluations than the default BFGS.
         return super(LogisticMixture, cls).from_samples(
-            *args, init_tries=init_tries, opt_tries=opt_tries, **kwargs
+            *args, init_tries=init_tries, opt_tries=opt_tries, method=method, **kwargs
         )
@@ -40,10 +40,11 @@ class Optimizable(ABC):
         verbose=False,
         init_tries=1,
         opt_tries=1,
+        method=None,
     ) -> T:
         if fixed_params is None:
             fixed_params = {}
-        data = np.array(data)
+        data = np.asarray(data, dtype=np.float32)
         if scale is None:
             data_range = max(data) - min(data)
             scale = Scale(
@@ -56,18 +57,23 @@ class Optimizable(ABC):
         def loss(opt_params):
             return static.dist_logloss(cls, fixed_params, opt_params, normalized_data)
 
-        def jac(opt_params):
-            return static.dist_grad_logloss(
+        def loss_and_grad(opt_params):
+            value, grad = static.dist_logloss_and_grad(
                 cls, fixed_params, opt_params, normalized_data
             )
+            # Convert to float64 on the host, since some scipy optimizers
+            # (e.g. L-BFGS-B) require it
+            return float(value), onp.asarray(grad, dtype=onp.float64)
 
         normalized_dist = cls.from_loss(
-            loss,
-            jac,
+            loss_and_grad,
+            jac=True,
+            init_loss=loss,
             fixed_params=fixed_params,
             verbose=verbose,
             init_tries=init_tries,
             opt_tries=opt_tries,
+            method=method,
         )
 
         return normalized_dist.denormalize(scale)
@@ -100,21 +106,24 @@ class Optimizable(ABC):
 
         if jit_all:
             jitted_loss = static.jitted_condition_loss
-            jitted_jac = static.jitted_condition_loss_grad
+            jitted_loss_and_grad = static.jitted_condition_loss_and_grad
         else:
             jitted_loss = static.condition_loss
-            jitted_jac = static.condition_loss_grad
+            jitted_loss_and_grad = static.condition_loss_and_grad
 
         def loss(opt_params):
             return jitted_loss(cls, fixed_params, opt_params, cond_classes, cond_params)
 
-        def jac(opt_params):
-            return jitted_jac(cls, fixed_params, opt_params, cond_classes, cond_params)
+        def loss_and_grad(opt_params):
+            return jitted_loss_and_grad(
+                cls, fixed_params, opt_params, cond_classes, cond_params
+            )
 
         normalized_dist = cls.from_loss(
             fixed_params=fixed_params,
-            loss=loss,
-            jac=jac,
+            loss=loss_and_grad,
+            jac=True,
+            init_loss=loss,
             verbose=verbose,
             init_tries=init_tries,
             opt_tries=opt_tries,
@@ -131,9 +140,14 @@ class Optimizable(ABC):
         verbose=False,
         init_tries=1,
         opt_tries=1,
+        method=None,
+        init_loss=None,
     ) -> T:
 
         # fixed_params are assumed to be normalized
+        # As in scipy.optimize.minimize, if jac is True, loss is assumed to
+        # return both the loss and its gradient. init_loss, if given, only
+        # returns the loss and is used to pick the initialization
 
         if fixed_params is None:
             fixed_params = {}
@@ -146,9 +160,11 @@ class Optimizable(ABC):
             loss,
             init=init,
             jac=jac,
+            init_loss=init_loss,
             init_tries=init_tries,
             opt_tries=opt_tries,
             verbose=verbose,
+            method=method,
         )
         if not fit_results.success and verbose:
             print(fit_results)
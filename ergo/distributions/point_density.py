@@ -38,9 +38,11 @@ class PointDensity(Distribution, Optimizable):
 
         self.scale = scale
 
+        # Store device arrays once, so that destructuring (once per optimizer
+        # step) doesn't transfer or copy host arrays every time
         if normalized:
-            self.normed_xs = xs
-            self.normed_densities = densities
+            self.normed_xs = np.asarray(xs)
+            self.normed_densities = np.asarray(densities)
 
         else:
             self.normed_xs = scale.normalize_points(xs)
@@ -80,7 +82,7 @@ class PointDensity(Distribution, Optimizable):
         :param x: The point at which to get the probability density
         """
         x = self.scale.normalize_point(x)
-        bin = np.argmin(np.abs(self.normed_xs - x))
+        bin = np.argmin(np.abs(self.normed_xs - np.expand_dims(x, -1)), axis=-1)
         return np.where(
             (x < 0) | (x > 1),
             0,
@@ -103,11 +105,13 @@ class PointDensity(Distribution, Optimizable):
         """
 
         x = self.scale.normalize_point(x)
-        bin = np.argmin(np.abs(constants.grid - x))
+        bin = np.argmin(np.abs(constants.grid - np.expand_dims(x, -1)), axis=-1)
         return np.where(x < 0, 0, np.where(x > 1, 1, self.cumulative_normed_ps[bin]))
 
     def ppf(self, q):
-        bin = np.argmin(np.abs(self.cumulative_normed_ps - q))
+        bin = np.argmin(
+            np.abs(self.cumulative_normed_ps - np.expand_dims(q, -1)), axis=-1
+        )
         return self.true_grid[bin]
 
     def modes(self, *args, **kwargs):
@@ -318,7 +322,17 @@ class PointDensity(Distribution, Optimizable):
 
     def cross_entropy(self, q_dist):
         # We assume that the distributions are on the same scale!
-        return -np.dot(self.bin_probs, safe_log(q_dist.bin_probs))
+        if isinstance(q_dist, PointDensity):
+            q_log_bin_probs = safe_log(q_dist.bin_probs)
+        else:
+            # Approximate q's bin probs by its density at our bin centers,
+            # so we only evaluate q.pdf at as many points as we have bins.
+            # safe_log keeps empty bins finite, so they contribute 0 * log(~0)
+            # rather than 0 * -inf = nan
+            q_log_bin_probs = safe_log(
+                q_dist.normalize().pdf(self.normed_xs) * constants.bin_sizes
+            )
+        return -np.dot(self.bin_probs, q_log_bin_probs)
 
     def mean(self):
         return np.dot(self.true_xs, self.bin_probs)
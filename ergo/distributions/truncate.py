@@ -26,18 +26,19 @@ class Truncate(Distribution):
             1.0 - self.base_dist.cdf(np.where(self.ceiling == np.inf, 1, self.ceiling)),
         )
         self.p_inside = 1.0 - (self.p_below + self.p_above)
+        self.log_p_inside = np.log(self.p_inside)
 
     # Distribution
 
+    def inside(self, x):
+        return (x >= self.floor) & (x <= self.ceiling)
+
     def pdf(self, x):
-        p_x = np.exp(self.base_dist.logpdf(x) - np.log(self.p_inside))
-        return np.where(x < self.floor, 0.0, np.where(x > self.ceiling, 0.0, p_x),)
+        return np.where(self.inside(x), self.base_dist.pdf(x) / self.p_inside, 0.0)
 
     def logpdf(self, x):
-        logp_x = self.base_dist.logpdf(x) - np.log(self.p_inside)
-        return np.where(
-            x < self.floor, -np.inf, np.where(x > self.ceiling, -np.inf, logp_x)
-        )
+        logp_x = self.base_dist.logpdf(x) - self.log_p_inside
+        return np.where(self.inside(x), logp_x, -np.inf)
 
     def cdf(self, x):
         c_x = (self.base_dist.cdf(x) - self.p_below) / self.p_inside
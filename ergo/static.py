@@ -1,8 +1,9 @@
-from functools import partial
+from functools import partial, reduce
 
-from jax import grad, jit, vmap
+from jax import grad, jit, lax, nn, value_and_grad, vmap
 import jax.numpy as np
 import jax.scipy as scipy
+from jax.tree_util import tree_flatten, tree_multimap
 
 # Multi-condition loss, jitting entire function (used for logistic
 # mixture dist + histogram loss)
@@ -17,41 +18,74 @@ def jitted_condition_loss(
     )
     dist = dist_class.from_params(dist_fixed_params, dist_opt_params, traceable=True)
     total_loss = 0.0
-    for (cond_class, cond_param) in zip(cond_classes, cond_params):
-        condition = cond_class[0].structure((cond_class, cond_param))
-        total_loss += condition.loss(dist)
+    for (cond_class, stacked_params) in stack_condition_params(
+        cond_classes, cond_params
+    ):
+        total_loss += batched_condition_loss(dist, cond_class, stacked_params)
     return total_loss * 100
 
 
-jitted_condition_loss_grad = jit(
-    grad(jitted_condition_loss, argnums=2), static_argnums=(0, 3)
+jitted_condition_loss_and_grad = jit(
+    value_and_grad(jitted_condition_loss, argnums=2), static_argnums=(0, 3)
 )
 
 
+def stack_condition_params(cond_classes, cond_params):
+    """
+    Group conditions that share a class and parameter shapes, and stack
+    the params of each group along a new leading axis so that the group
+    can be evaluated with a single vmap
+    """
+    groups = {}
+    for (cond_class, cond_param) in zip(cond_classes, cond_params):
+        leaves, treedef = tree_flatten(cond_param)
+        key = (cond_class, treedef, tuple(np.shape(leaf) for leaf in leaves))
+        groups.setdefault(key, []).append(cond_param)
+    return [
+        (key[0], tree_multimap(lambda *xs: np.stack(xs), *group))
+        for (key, group) in groups.items()
+    ]
+
+
+def batched_condition_loss(dist, cond_class, stacked_params):
+    def loss(cond_param):
+        condition = cond_class[0].structure((cond_class, cond_param))
+        return condition.loss(dist)
+
+    return np.sum(vmap(loss)(stacked_params))
+
+
 # Multi-condition loss, jitting only individual condition losses (used
-# for histogram dist + arbitrary losses)
+# for histogram dist + arbitrary losses). Per-condition results are
+# summed on the device.
 
 
 def condition_loss(
     dist_class, dist_fixed_params, dist_opt_params, cond_classes, cond_params
 ):
-    total_loss = 0.0
-    for (cond_class, cond_param) in zip(cond_classes, cond_params):
-        total_loss += single_condition_loss(
+    losses = [
+        single_condition_loss(
             dist_class, dist_fixed_params, dist_opt_params, cond_class, cond_param
         )
-    return total_loss
+        for (cond_class, cond_param) in zip(cond_classes, cond_params)
+    ]
+    return reduce(np.add, losses, 0.0)
 
 
-def condition_loss_grad(
+def condition_loss_and_grad(
     dist_class, dist_fixed_params, dist_opt_params, cond_classes, cond_params
 ):
-    total_grad = 0.0
-    for (cond_class, cond_param) in zip(cond_classes, cond_params):
-        total_grad += single_condition_loss_grad(
+    losses_and_grads = [
+        single_condition_loss_and_grad(
             dist_class, dist_fixed_params, dist_opt_params, cond_class, cond_param
         )
-    return total_grad
+        for (cond_class, cond_param) in zip(cond_classes, cond_params)
+    ]
+    return reduce(
+        lambda total, term: tree_multimap(np.add, total, term),
+        losses_and_grads,
+        (0.0, 0.0),
+    )
 
 
 @partial(jit, static_argnums=(0, 3))
@@ -72,8 +106,8 @@ def single_condition_loss(
     return loss
 
 
-single_condition_loss_grad = jit(
-    grad(single_condition_loss, argnums=2), static_argnums=(0, 3)
+single_condition_loss_and_grad = jit(
+    value_and_grad(single_condition_loss, argnums=2), static_argnums=(0, 3)
 )
 
 
@@ -88,19 +122,48 @@ def describe_fit(dist_classes, dist_params, cond_class, cond_params):
     return condition._describe_fit(dist)
 
 
+# Percent point function (inverse of cdf) by bisection
+
+bisect_iterations = 60
+
+
+@partial(jit, static_argnums=0)
+def mixture_ppf(mixture_classes, mixture_params, qs):
+    # The quantile of a mixture distribution can always be found within
+    # the range of its components quantiles, so we bracket with those
+    mixture = mixture_classes[0].structure((mixture_classes, mixture_params))
+    ppfs = np.stack([c.ppf(qs) for c in mixture.components])
+    cmin = np.min(ppfs, axis=0)
+    cmax = np.max(ppfs, axis=0)
+    return bisect_ppf(
+        mixture.cdf, qs, cmin - np.abs(cmin / 100), cmax + np.abs(cmax / 100)
+    )
+
+
+def bisect_ppf(cdf, qs, lows, highs):
+    # Bisect all quantiles at once, assuming that cdf is vectorized
+    # and that [lows, highs] brackets each of the qs
+    def bisect_step(_, bounds):
+        low, high = bounds
+        mid = (low + high) / 2
+        below = cdf(mid) < qs
+        return (np.where(below, mid, low), np.where(below, high, mid))
+
+    low, high = lax.fori_loop(0, bisect_iterations, bisect_step, (lows, highs))
+    return (low + high) / 2
+
+
 # General negative log likelihood
 
 
 @partial(jit, static_argnums=0)
 def dist_logloss(dist_class, fixed_params, opt_params, data):
     dist = dist_class.from_params(fixed_params, opt_params, traceable=True)
-    if data.size == 1:
-        return -dist.logpdf(data)
-    scores = vmap(dist.logpdf)(data)
-    return -np.sum(scores)
+    # logpdf broadcasts over data, so no vmap or scalar special case is needed
+    return -np.sum(dist.logpdf(data))
 
 
-dist_grad_logloss = jit(grad(dist_logloss, argnums=2), static_argnums=0)
+dist_logloss_and_grad = jit(value_and_grad(dist_logloss, argnums=2), static_argnums=0)
 
 
 # Logistic mixture
@@ -110,32 +173,43 @@ dist_grad_logloss = jit(grad(dist_logloss, argnums=2), static_argnums=0)
 def logistic_logpdf(x, loc, scale):
     # x, loc, scale are assumed to be normalized
     # https://docs.scipy.org/doc/scipy/reference/generated/scipy.stats.logistic.html
+    # log(exp(-y) / (1 + exp(-y))^2) = -y - 2 * log(1 + exp(-y))
     y = (x - loc) / scale
-    return scipy.stats.logistic.logpdf(y) - np.log(scale)
-
+    return -y - 2.0 * nn.softplus(-y) - np.log(scale)
 
-@jit
-def logistic_mixture_logpdf(params, data):
-    # params are assumed to be normalized
-    if data.size == 1:
-        return logistic_mixture_logpdf1(params, data)
-    scores = vmap(partial(logistic_mixture_logpdf1, params))(data)
-    return np.sum(scores)
 
-
-@jit
-def logistic_mixture_logpdf1(params, datum):
+@partial(jit, static_argnums=2)
+def logistic_mixture_logpdf(params, data, num_components):
     # params are assumed to be normalized
-    structured_params = params.reshape((-1, 3))
-    component_scores = []
-    for (loc, scale, component_prob) in structured_params:
-        component_scores.append(
-            logistic_logpdf(datum, loc, scale) + np.log(component_prob)
-        )
-    return scipy.special.logsumexp(np.array(component_scores))
-
-
-logistic_mixture_grad_logpdf = jit(grad(logistic_mixture_logpdf, argnums=0))
+    # data of any shape (including a single datum) broadcasts against
+    # the components, so no special case is needed for data.size == 1
+    # num_components is static, so each mixture size gets its own
+    # compiled kernel
+    component_scores = logistic_mixture_component_scores(params, data, num_components)
+    return np.sum(scipy.special.logsumexp(component_scores, axis=-1))
+
+
+@partial(jit, static_argnums=2)
+def logistic_mixture_logpdf1(params, datum, num_components):
+    return logistic_mixture_logpdf(params, datum, num_components)
+
+
+def logistic_mixture_component_scores(params, data, num_components):
+    # Each component is parameterized as (loc, s_param, prob_logit), with
+    # scale = softplus(s_param) + 0.01 and probs = softmax(prob_logits), so
+    # that any params are valid and no clipping is needed on the hot path.
+    # Evaluate all components at once: data[..., None] broadcasts against
+    # the (num_components,) arrays of locs, scales and log probs
+    structured_params = params.reshape((num_components, 3))
+    locs = structured_params[:, 0]
+    scales = nn.softplus(structured_params[:, 1]) + 0.01
+    logprobs = nn.log_softmax(structured_params[:, 2])
+    return logistic_logpdf(data[..., None], locs, scales) + logprobs
+
+
+logistic_mixture_grad_logpdf = jit(
+    grad(logistic_mixture_logpdf, argnums=0), static_argnums=2
+)
 
 
 # Wasserstein distance
@@ -143,6 +217,8 @@ logistic_mixture_grad_logpdf = jit(grad(logistic_mixture_logpdf, argnums=0))
 
 @jit
 def wasserstein_distance(xs, ys):
-    diffs = np.cumsum(xs - ys)
-    abs_diffs = np.abs(diffs)
-    return np.sum(abs_diffs)
+    # xs and ys are densities on the same grid, so the cumulative sum of
+    # their difference is the difference of their cdfs. Reducing over the
+    # last axis lets us compare a whole (batch, grid) array of distribution
+    # pairs in one call.
+    return np.sum(np.abs(np.cumsum(xs - ys, axis=-1)), axis=-1)
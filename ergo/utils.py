@@ -44,17 +44,41 @@ def minimize_random(fun, init, tries=100):
     return best_x
 
 
-def minimize(fun, *args, init=None, init_tries=1, opt_tries=1, verbose=False, **kwargs):
+def minimize(
+    fun,
+    *args,
+    init=None,
+    init_loss=None,
+    init_tries=1,
+    opt_tries=1,
+    verbose=False,
+    **kwargs,
+):
     """
     Wrapper around scipy.optimize.minimize that supports retries
+
+    As with scipy, if jac is True, fun is assumed to return both the
+    loss and its gradient. Initializations are ranked with init_loss,
+    which should return only the loss, so that they don't pay for a
+    gradient computation; if it isn't given, fun is used instead.
     """
     if "x0" in kwargs:
         raise ValueError("Provide initialization function (init), not x0")
 
+    if init_loss is not None:
+        loss = init_loss
+    elif kwargs.get("jac") is True:
+
+        def loss(x):
+            return fun(x)[0]
+
+    else:
+        loss = fun
+
     best_results = None
     best_loss = float("+inf")
     while opt_tries > 0:
-        init_params = minimize_random(fun, init, tries=init_tries)
+        init_params = minimize_random(loss, init, tries=init_tries)
         results = oscipy.optimize.minimize(fun, *args, x0=init_params, **kwargs)
         opt_tries -= 1
         if best_results is None or results.fun < best_loss:
@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 
+from jax import grad
 import jax.numpy as np
+import numpy as onp
 import pytest
 
 from ergo.conditions import (
@@ -8,10 +10,13 @@ from ergo.conditions import (
     MaxEntropyCondition,
     MeanCondition,
     ModeCondition,
+    PartialCrossEntropyCondition,
     PointDensityCondition,
     SmoothnessCondition,
     VarianceCondition,
+    crossentropy,
 )
+from ergo.conditions.crossentropy import weighted_logpdf_sum
 from ergo.distributions import Logistic, LogisticMixture, PointDensity
 from ergo.scale import Scale
 
@@ -138,6 +143,20 @@ def test_mixture_from_percentiles():
         assert dist.cdf(condition.max) == pytest.approx(condition.p, rel=0.1)
 
 
+def test_mixture_from_percentiles_jit_all():
+    # All IntervalConditions share a shape, so their losses get batched
+    conditions = [
+        IntervalCondition(p=0.1, max=1),
+        IntervalCondition(p=0.5, max=2),
+        IntervalCondition(p=0.6, max=3),
+    ]
+    dist = LogisticMixture.from_conditions(
+        conditions, {"num_components": 4}, scale=Scale(0, 3), jit_all=True
+    )
+    for condition in conditions:
+        assert dist.cdf(condition.max) == pytest.approx(condition.p, rel=0.1)
+
+
 def test_percentiles_from_mixture():
     xscale = Scale(-1, 4)
     mixture = LogisticMixture(
@@ -343,6 +362,41 @@ def test_mixed_2(point_densities):
     assert my_cache[conditions_2] == 3
 
 
+def test_partial_cross_entropy_chunking(normalized_logistic_mixture):
+    xs = np.linspace(0.01, 0.99, 101)
+    ps = np.full(101, 1 / 101)
+    logpdf = normalized_logistic_mixture.logpdf
+    direct = weighted_logpdf_sum(logpdf, xs, ps)
+    # 101 points don't divide evenly into chunks of 16, so this checks padding too
+    chunked = weighted_logpdf_sum(logpdf, xs, ps, chunk_size=16)
+    assert float(chunked) == pytest.approx(float(direct), rel=1e-5)
+
+    condition = PartialCrossEntropyCondition(xs, ps, weight=1.0)
+    assert float(condition.loss(normalized_logistic_mixture)) == pytest.approx(
+        -float(direct), rel=1e-5
+    )
+
+
+def test_partial_cross_entropy_chunking_grad(monkeypatch):
+    xs = np.linspace(0.01, 0.99, 101)
+    ps = np.full(101, 1 / 101)
+    condition = PartialCrossEntropyCondition(xs, ps, weight=1.0)
+    fixed_params = {"num_components": 3}
+    onp.random.seed(0)
+    opt_params = np.array(LogisticMixture.initialize_optimizable_params(fixed_params))
+
+    def loss(opt_params):
+        return condition.loss(LogisticMixture.from_params(fixed_params, opt_params))
+
+    direct_grad = grad(loss)(opt_params)
+    # 101 points don't divide evenly into chunks of 16, so this checks padding too
+    monkeypatch.setattr(crossentropy, "logpdf_chunk_size", 16)
+    chunked_grad = grad(loss)(opt_params)
+    assert onp.array(chunked_grad) == pytest.approx(
+        onp.array(direct_grad), rel=1e-4, abs=1e-6
+    )
+
+
 def test_point_densities_fit(point_densities):
     condition = PointDensityCondition(
         point_densities["xs"], point_densities["densities"]
@@ -1,3 +1,4 @@
+from jax import grad
 import jax.numpy as np
 import numpy as onp
 import pytest
@@ -6,6 +7,7 @@ import scipy
 from ergo import Logistic, LogisticMixture, Truncate
 from ergo.conditions import PointDensityCondition
 from ergo.scale import LogScale, Scale
+import ergo.static as static
 from ergo.utils import trapz
 from tests.conftest import scales_to_test
 
@@ -37,6 +39,43 @@ def test_cdf(xscale: Scale):
             )
 
 
+def test_logistic_logpdf():
+    xs = onp.linspace(-1, 2, 31)
+    for (loc, s) in [(0.5, 0.1), (0.2, 0.01), (1.5, 2)]:
+        expected = scipy.stats.logistic.logpdf(xs, loc, s)
+        assert onp.array(static.logistic_logpdf(xs, loc, s)) == pytest.approx(
+            expected, rel=1e-4, abs=1e-4
+        )
+
+
+def test_logistic_mixture_logpdf():
+    # Each component is (loc, s_param, prob_logit), with scale
+    # softplus(s_param) + 0.01 and weights softmax(prob_logits)
+    params = np.array([0.2, -1.0, 0.5, 0.6, 0.0, -0.3, 0.9, -2.0, 0.1])
+    structured_params = onp.array(params).reshape((3, 3))
+    ss = onp.logaddexp(0, structured_params[:, 1]) + 0.01
+    probs = onp.exp(structured_params[:, 2]) / onp.sum(
+        onp.exp(structured_params[:, 2])
+    )
+    mixture = LogisticMixture(
+        components=[
+            Logistic(loc, s, normalized=True)
+            for (loc, s) in zip(structured_params[:, 0], ss)
+        ],
+        probs=list(probs),
+    )
+
+    xs = np.linspace(-0.5, 1.5, 21)
+    assert float(static.logistic_mixture_logpdf(params, xs, 3)) == pytest.approx(
+        float(np.sum(mixture.logpdf(xs))), rel=1e-4
+    )
+    assert float(static.logistic_mixture_logpdf(params, 0.3, 3)) == pytest.approx(
+        float(mixture.logpdf(0.3)), rel=1e-4
+    )
+    params_grad = onp.array(static.logistic_mixture_grad_logpdf(params, xs, 3))
+    assert onp.all(onp.isfinite(params_grad))
+
+
 # TODO test truncated Logistic better in this file
 
 
@@ -343,6 +382,52 @@ def test_logistic_mixture_normalization():
     )
 
 
+def test_mixture_vectorized(logistic_mixture10, truncated_logistic_mixture):
+    # The vectorized mixture methods should agree with the weighted
+    # sum over components
+    for mixture in [logistic_mixture10, truncated_logistic_mixture]:
+        xs = mixture.scale.denormalize_points(onp.linspace(-0.1, 1.1, 50))
+        for method in ["pdf", "cdf"]:
+            expected = sum(
+                p * onp.array(getattr(c, method)(xs))
+                for (c, p) in zip(mixture.components, mixture.probs)
+            )
+            assert onp.array(getattr(mixture, method)(xs)) == pytest.approx(
+                expected, rel=1e-4, abs=1e-9
+            )
+
+
+def test_mixture_from_params_arrays():
+    # from_params passes its params to the mixture as arrays, which should
+    # match the arrays collected from its components
+    onp.random.seed(0)
+    fixed_params = {"num_components": 3, "floor": 0.2, "ceiling": 0.8}
+    opt_params = np.array(LogisticMixture.initialize_optimizable_params(fixed_params))
+    mixture = LogisticMixture.from_params(fixed_params, opt_params)
+    from_components = LogisticMixture(mixture.components, mixture.probs)
+    xs = onp.linspace(-0.1, 1.1, 50)
+    for method in ["pdf", "logpdf", "cdf"]:
+        assert onp.array(getattr(mixture, method)(xs)) == pytest.approx(
+            onp.array(getattr(from_components, method)(xs)), rel=1e-4, abs=1e-9
+        )
+
+
+def test_truncated_mixture_pdf_grad():
+    # Outside the truncation bounds, pdf should be 0 with a finite gradient
+    onp.random.seed(0)
+    fixed_params = {"num_components": 2, "floor": 0.2, "ceiling": 0.8}
+    opt_params = np.array(LogisticMixture.initialize_optimizable_params(fixed_params))
+
+    def pdf(opt_params, x):
+        return LogisticMixture.from_params(fixed_params, opt_params).pdf(x)
+
+    for x in [0.1, 0.5, 0.9]:
+        pdf_grad = onp.array(grad(pdf)(opt_params, x))
+        assert onp.all(onp.isfinite(pdf_grad))
+        if x < 0.2 or x > 0.8:
+            assert float(pdf(opt_params, x)) == 0
+
+
 def test_destructure(logistic_mixture10, truncated_logistic_mixture):
     for original_mixture in [logistic_mixture10, truncated_logistic_mixture]:
         params = original_mixture.destructure()
@@ -353,6 +438,16 @@ def test_destructure(logistic_mixture10, truncated_logistic_mixture):
         )
 
 
+def test_mixture_from_params_eq():
+    fixed_params = {"num_components": 3}
+    onp.random.seed(0)
+    opt_params = np.array(LogisticMixture.initialize_optimizable_params(fixed_params))
+    other_params = np.array(LogisticMixture.initialize_optimizable_params(fixed_params))
+    mixture = LogisticMixture.from_params(fixed_params, opt_params)
+    assert mixture == LogisticMixture.from_params(fixed_params, opt_params)
+    assert mixture != LogisticMixture.from_params(fixed_params, other_params)
+
+
 def test_destructure_with_cond(truncated_logistic_mixture, point_densities):
     PointDensityCondition(
         point_densities["xs"], point_densities["densities"]
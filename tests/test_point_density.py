@@ -11,6 +11,7 @@ from ergo.conditions import (
 import ergo.distributions.constants as constants
 from ergo.distributions.point_density import PointDensity
 from ergo.scale import LogScale, Scale
+import ergo.static as static
 from tests.conftest import scales_to_test
 
 
@@ -211,6 +212,32 @@ def test_add_endpoints():
     assert densities == pytest.approx(expected_densities, abs=1e-5)
 
 
+def test_cross_entropy_with_mixture(normalized_logistic_mixture):
+    densities = normalized_logistic_mixture.pdf(constants.target_xs)
+    p_dist = PointDensity(
+        constants.target_xs, densities / np.mean(densities), scale=Scale(0, 1)
+    )
+    # The cross-entropy of p with (a continuous version of) itself
+    # is its entropy
+    assert float(p_dist.cross_entropy(normalized_logistic_mixture)) == pytest.approx(
+        float(p_dist.entropy()), rel=0.01
+    )
+    cond = CrossEntropyCondition(p_dist=p_dist)
+    assert float(cond.loss(normalized_logistic_mixture)) == pytest.approx(
+        float(cond.loss(p_dist)), rel=0.01
+    )
+
+
+def test_wasserstein_distance_batched():
+    # Stacked (batch, grid) densities should give the per-pair distances
+    xs = np.stack([logistic.pdf(constants.target_xs, loc, 0.1) for loc in [0.2, 0.5]])
+    ys = np.stack([norm.pdf(constants.target_xs, loc, 0.1) for loc in [0.6, 0.5]])
+    expected = [float(static.wasserstein_distance(x, y)) for (x, y) in zip(xs, ys)]
+    assert np.array(static.wasserstein_distance(xs, ys)) == pytest.approx(
+        np.array(expected), rel=1e-5
+    )
+
+
 @pytest.mark.parametrize("scale", scales_to_test)
 def test_mean(scale: Scale):
     true_mean = scale.low + scale.width / 2